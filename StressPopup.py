@@ -6,6 +6,7 @@ import time
 import tkinter as tk
 from tkinter import ttk
 import threading
+from metrics import performance_metrics
 
 # Load environment variables from the .env file
 load_dotenv()
@@ -24,6 +25,7 @@ class StressPopup:
         self.cached_tip = None
         self.cached_positive = None
         self.cache_time = 0
+        self.metrics = performance_metrics
     
     def check_and_show_motivation(self, stress_attempts):
         """Check stress attempts and show motivation at 5+ attempts with 5-attempt intervals"""
@@ -48,17 +50,18 @@ class StressPopup:
             return self.cached_tip
             
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[
-                    {
-                        "role": "user",
-                        "content": "Give a simple, practical tip for reducing stress. Focus on common techniques like breathing, stretching, or taking a short break. Also include a short fact about stress relief. Keep it friendly and straightforward, under 30 words."
-                    }
-                ],
-                max_tokens=40,
-                temperature=0.7
-            )
+            with self.metrics.stage('openai'):
+                response = openai.ChatCompletion.create(
+                    model="gpt-4",
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": "Give a simple, practical tip for reducing stress. Focus on common techniques like breathing, stretching, or taking a short break. Also include a short fact about stress relief. Keep it friendly and straightforward, under 30 words."
+                        }
+                    ],
+                    max_tokens=40,
+                    temperature=0.7
+                )
             self.cached_tip = response.choices[0].message["content"].strip()
             self.cache_time = time.time()
             return self.cached_tip
@@ -73,17 +76,18 @@ class StressPopup:
             return self.cached_positive
             
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[
-                    {
-                        "role": "user",
-                        "content": "Give a simple, encouraging message about making progress in breaking bad habits. Focus on the positive impact of their effort. Also a short fact on benefits of breaking bad habits. Keep it friendly and straightforward, under 30 words."
-                    }
-                ],
-                max_tokens=30,
-                temperature=0.7  # Lower temperature for more consistent messages
-            )
+            with self.metrics.stage('openai'):
+                response = openai.ChatCompletion.create(
+                    model="gpt-4",
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": "Give a simple, encouraging message about making progress in breaking bad habits. Focus on the positive impact of their effort. Also a short fact on benefits of breaking bad habits. Keep it friendly and straightforward, under 30 words."
+                        }
+                    ],
+                    max_tokens=30,
+                    temperature=0.7  # Lower temperature for more consistent messages
+                )
             self.cached_positive = response.choices[0].message["content"].strip()
             self.cache_time = time.time()
             return self.cached_positive
@@ -95,18 +99,22 @@ class StressPopup:
         """Display the motivational popup"""
         # Show multiple toasts in sequence to create a longer-lasting effect
         for _ in range(1):  # Show 3 toasts in sequence
-            st.toast(
-                f"🌟 You've reached {current_attempts} stress attempts!\n"
-                f"Here's something to help you relax:\n"
-                f"**{self.fetch_ai_tip()}**",
-                icon="🌟"
-            )
+            tip = self.fetch_ai_tip()
+            with self.metrics.stage('popup'):
+                st.toast(
+                    f"🌟 You've reached {current_attempts} stress attempts!\n"
+                    f"Here's something to help you relax:\n"
+                    f"**{tip}**",
+                    icon="🌟"
+                )
 
     def show_positive_popup(self, time_since_last_stress):
         """Display the positive reinforcement popup"""
-        st.toast(
-            f"🎉 You've been stress-free for {int(time_since_last_stress)} seconds!\n"
-            f"**{self.fetch_positive_message()}**",
-            icon="🎉"
-        )
+        message = self.fetch_positive_message()
+        with self.metrics.stage('popup'):
+            st.toast(
+                f"🎉 You've been stress-free for {int(time_since_last_stress)} seconds!\n"
+                f"**{message}**",
+                icon="🎉"
+            )
 
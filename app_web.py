@@ -9,11 +9,15 @@ from sound_manager import SoundManager
 from camera_manager import CameraManager
 from ui import UI 
 from StressPopup import StressPopup
+from metrics import performance_metrics
+from landmark_recording import LandmarkRecorder
+from frame_scheduler import AdaptiveFrameScheduler
+from detection_worker import DetectionWorker
+from auto_tuner import AutoTuner
 
 def main():
     # Initialize components
     ui = UI()
-    detection_manager = DetectionManager()
     sound_manager = SoundManager()
     camera_manager = CameraManager() 
     stress_popup = StressPopup() 
@@ -48,6 +52,37 @@ def main():
         # Setup layout and get settings
         col1, col2 = ui.setup_layout()
         sensitivity, sound_enabled = ui.create_sidebar()
+        ui.create_metrics_panel()
+        face_models = {"FaceMesh (most precise)": 'face_mesh', "Face Detection (faster)": 'face_detection',
+                       "Haar Cascade (fastest)": 'haar_cascade'}
+        face_provider = face_models[st.sidebar.selectbox("Face Model", list(face_models))]
+        detection_options = {'face_provider': face_provider}
+        # Detection profile tuned for this computer and face model (see auto_tuner.py)
+        if st.sidebar.checkbox("Auto-tune for This Computer", value=False):
+            tuner = AutoTuner(target_fps=st.sidebar.slider("Target FPS", 10, 30, 20), face_provider=face_provider)
+            tuning_profile = tuner.cached_profile()
+            if tuning_profile is None or st.sidebar.button("Recalibrate"):
+                with st.spinner("Calibrating detection for this computer..."):
+                    tuning_profile = tuner.calibrate_camera(camera_manager)
+            if tuning_profile:
+                st.sidebar.caption(f"Profile: {tuning_profile['name']}")
+                detection_options = tuner.detection_options(tuning_profile)
+        recording_path = None
+        if st.sidebar.checkbox("Record Landmarks", value=False):
+            # Landmarks are saved for offline threshold tuning (see landmark_recording.py)
+            recording_path = f"recordings/landmarks_{int(time.time())}.habl"
+        if st.sidebar.checkbox("Run Detection in Separate Process", value=False):
+            # Inference runs on another core and a model crash only restarts the worker
+            detection_manager = DetectionWorker(recording_path=recording_path, **detection_options)
+        else:
+            detection_manager = DetectionManager(**detection_options)
+            if recording_path:
+                detection_manager.recorder = LandmarkRecorder(recording_path)
+        adaptive_rate = st.sidebar.checkbox("Adaptive Frame Rate (saves battery)", value=True)
+        frame_scheduler = AdaptiveFrameScheduler() if adaptive_rate else None
+        inference_interval = st.sidebar.slider("Run full detection every N frames", 1, 5, 1,
+                                               help="Frames in between are tracked with optical flow")
+        detection_manager.set_inference_interval(inference_interval)
         sound_manager.set_sound_enabled(sound_enabled)
         # Camera controls
         if st.sidebar.button("Start Camera") and not camera_manager.camera_active:
@@ -70,6 +105,8 @@ def main():
         if camera_manager.is_active():
             try:
                 while camera_manager.camera_active:
+                    if frame_scheduler:
+                        frame_scheduler.wait()  # Pace capture and inference to the current tier
                     success, frame = camera_manager.read_frame()
                     
                     if not success:
@@ -80,6 +117,12 @@ def main():
                         # Process frame for detection
                         frame, hand_coords, face_zones, behavior = detection_manager.process_frame(frame, sensitivity)
 
+                        if frame_scheduler:
+                            previous_tier = frame_scheduler.tier
+                            frame_scheduler.observe(detection_manager.hand_detected, detection_manager.target_distance)
+                            if frame_scheduler.tier != previous_tier:
+                                camera_manager.set_frame_rate(frame_scheduler.current_fps())
+
                         # Check behavior and show warning
                         if behavior is not None and None not in hand_coords:
                             timestamp = time.time()
@@ -123,6 +166,8 @@ def main():
 
                         # Update UI with frame
                         ui.update_frame(frame)
+                        performance_metrics.mark_frame()
+                        ui.update_metrics_panel()
 
                         # Stats
                         current_duration = st.session_state.total_duration
@@ -149,7 +194,8 @@ def main():
                             stress_attempts=st.session_state.stress_attempts,
                             sensitivity=sensitivity,
                             stress_duration=current_duration,
-                            time_since_last_stress=time_since_last_stress
+                            time_since_last_stress=time_since_last_stress,
+                            frame_rate_tiers=frame_scheduler.tier_durations() if frame_scheduler else None
                         )
 
             except Exception as e:
@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import platform
+import time
+
+import cv2
+
+from detection import DetectionManager
+
+# Candidate profiles, most accurate first. Only the detection side is tuned: the
+# capture resolution stays fixed because sensitivity and the frame scheduler's
+# approach/release distances are measured in frame pixels, and a smaller capture
+# would silently make them more lenient. Lower inference scales keep the same
+# pixel geometry while the models see a downscaled copy of the frame.
+TUNING_PROFILES = [
+    {'name': 'full_refined', 'model_complexity': 1, 'refine_landmarks': True,
+     'min_tracking_confidence': 0.5, 'inference_scale': 1.0},
+    {'name': 'full', 'model_complexity': 1, 'refine_landmarks': False,
+     'min_tracking_confidence': 0.5, 'inference_scale': 1.0},
+    {'name': 'full_scaled', 'model_complexity': 1, 'refine_landmarks': False,
+     'min_tracking_confidence': 0.5, 'inference_scale': 0.75},
+    {'name': 'lite', 'model_complexity': 0, 'refine_landmarks': False,
+     'min_tracking_confidence': 0.5, 'inference_scale': 0.75},
+    {'name': 'lite_scaled', 'model_complexity': 0, 'refine_landmarks': False,
+     'min_tracking_confidence': 0.4, 'inference_scale': 0.5},
+    {'name': 'lite_min', 'model_complexity': 0, 'refine_landmarks': False,
+     'min_tracking_confidence': 0.3, 'inference_scale': 0.35},
+]
+
+DETECTION_KEYS = ('model_complexity', 'refine_landmarks', 'min_tracking_confidence', 'inference_scale')
+
+
+class AutoTuner:
+    """
+    Picks the most accurate detection profile that reaches a target frame rate
+    on the local machine. Each candidate in TUNING_PROFILES is timed on a short
+    burst of camera frames with the selected face anchor provider, and the
+    chosen profile is cached on disk per machine and provider so later startups
+    skip calibration.
+    """
+    def __init__(self, target_fps=20, calibration_frames=30, warmup_frames=5, headroom=1.2,
+                 cache_path=None, profiles=None, face_provider='face_mesh'):
+        """
+        Initialize the tuner.
+
+        Args:
+            target_fps: Frame rate the chosen profile must sustain
+            calibration_frames: Timed frames per candidate profile
+            warmup_frames: Untimed frames per candidate (model start-up)
+            headroom: Detection alone must reach target_fps * headroom, leaving time
+                      for capture and UI updates
+            cache_path: Where tuned profiles are stored (default ~/.habitaware/tuning.json)
+            profiles: Candidate profiles, most accurate first (default TUNING_PROFILES)
+            face_provider: Face anchor provider the profiles are measured with
+                           (see face_anchors.FACE_ANCHOR_PROVIDERS)
+        """
+        self.target_fps = target_fps
+        self.calibration_frames = calibration_frames
+        self.warmup_frames = warmup_frames
+        self.headroom = headroom
+        self.cache_path = cache_path or os.path.join(os.path.expanduser("~"), ".habitaware", "tuning.json")
+        self.profiles = profiles or TUNING_PROFILES
+        self.face_provider = face_provider
+
+    def machine_key(self):
+        """
+        Identify this machine, software stack and face provider, so a cached
+        profile is only reused where and how it was measured.
+
+        Returns:
+            str: A short hash of host, CPU, library versions, target fps and face provider
+        """
+        import mediapipe
+        parts = [platform.node(), platform.machine(), platform.processor(), str(os.cpu_count()),
+                 mediapipe.__version__, cv2.__version__, str(self.target_fps), self.face_provider]
+        return hashlib.sha1("|".join(parts).encode()).hexdigest()[:16]
+
+    def _read_cache(self):
+        try:
+            with open(self.cache_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def cached_profile(self):
+        """
+        Returns:
+            dict: The cached profile for this machine, or None if it was never calibrated
+        """
+        entry = self._read_cache().get(self.machine_key())
+        return entry['profile'] if entry else None
+
+    def save_profile(self, profile, measured_fps):
+        """
+        Store the chosen profile for this machine.
+        """
+        cache = self._read_cache()
+        cache[self.machine_key()] = {
+            'profile': profile,
+            'measured_fps': measured_fps,
+            'target_fps': self.target_fps,
+            'calibrated_at': time.time(),
+        }
+        directory = os.path.dirname(self.cache_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(self.cache_path, 'w') as f:
+            json.dump(cache, f, indent=2)
+
+    def measure(self, profile, frames):
+        """
+        Time DetectionManager.process_frame under a profile.
+
+        Args:
+            profile: Candidate profile
+            frames: Captured BGR frames at the capture resolution
+
+        Returns:
+            float: Sustained detection frame rate (from the median frame time)
+        """
+        detection_manager = DetectionManager(draw_landmarks=False, **self.detection_options(profile))
+        try:
+            for i in range(self.warmup_frames):
+                detection_manager.process_frame(frames[i % len(frames)])
+            durations = []
+            for i in range(self.calibration_frames):
+                start = time.perf_counter()
+                detection_manager.process_frame(frames[i % len(frames)])
+                durations.append(time.perf_counter() - start)
+        finally:
+            detection_manager.cleanup()
+        durations.sort()
+        median = durations[len(durations) // 2]
+        return 1.0 / median if median > 0 else float('inf')
+
+    def calibrate(self, frames):
+        """
+        Walk the candidates from most to least accurate and keep the first that
+        is fast enough. Falls back to the fastest candidate if none is.
+
+        Args:
+            frames: Captured BGR frames, ideally showing the user's face and hands
+
+        Returns:
+            dict: The chosen profile (also saved to the cache)
+        """
+        best_profile, best_fps = None, 0.0
+        for profile in self.profiles:
+            fps = self.measure(profile, frames)
+            if fps >= self.target_fps * self.headroom:
+                best_profile, best_fps = profile, fps
+                break
+            if fps > best_fps:
+                best_profile, best_fps = profile, fps
+        self.save_profile(best_profile, best_fps)
+        return best_profile
+
+    def calibrate_camera(self, camera_manager, frame_count=20):
+        """
+        Capture a short burst from the camera at the capture resolution
+        and calibrate on it. The camera is left in the state it was found in.
+
+        Args:
+            camera_manager: CameraManager to capture from
+            frame_count: Number of frames to capture
+
+        Returns:
+            dict: The chosen profile, or None if no frames could be captured
+        """
+        started = camera_manager.start_camera()
+        try:
+            frames = []
+            for _ in range(frame_count):
+                success, frame = camera_manager.read_frame()
+                if success:
+                    frames.append(frame)
+        finally:
+            if started:
+                camera_manager.stop_camera()
+        return self.calibrate(frames) if frames else None
+
+    def detection_options(self, profile):
+        """
+        Returns:
+            dict: DetectionManager keyword arguments for a profile, including the face provider
+        """
+        options = {key: profile[key] for key in DETECTION_KEYS}
+        options['face_provider'] = self.face_provider
+        return options
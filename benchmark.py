@@ -0,0 +1,335 @@
+"""
+Reproducible CPU benchmarks for the detection pipeline.
+
+Suites:
+    pipeline  - end-to-end DetectionManager.process_frame on clips or synthetic frames
+    geometry  - face target and proximity geometry on synthetic landmark fixtures
+                (no model inference, runs without MediaPipe)
+    encode    - the UI frame path: BGR->RGB conversion plus the JPEG encode st.image performs
+    anchors   - face anchor providers: latency, and mouth/hair target error against FaceMesh
+                (needs --clip recordings with a face in view)
+
+Usage:
+    python benchmark.py --clip session.mp4 --output results.json
+    python benchmark.py --clip session.mp4 --baseline results.json --max-regression 0.15
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from proximity import face_targets, classify_proximity
+
+SUITES = ['pipeline', 'geometry', 'encode', 'anchors']
+
+# Meta fields that define what a run measured; results are only comparable when they match
+RUN_DEFINING_META = ['clips', 'frames', 'seed', 'inference_interval', 'width', 'height', 'sensitivity']
+
+
+def summarize(samples, items_per_sample=1):
+    """
+    Summarize latency samples into throughput and percentiles.
+
+    Args:
+        samples: List of per-iteration durations in seconds
+        items_per_sample: Number of items (frames, fixtures) processed per sample
+
+    Returns:
+        dict: Iteration count, throughput per second and latency percentiles in ms
+    """
+    samples = np.asarray(samples)
+    total = samples.sum()
+    return {
+        'iterations': int(samples.size),
+        'throughput_per_s': float(samples.size * items_per_sample / total) if total > 0 else 0.0,
+        'mean_ms': float(samples.mean() * 1000),
+        'p50_ms': float(np.percentile(samples, 50) * 1000),
+        'p95_ms': float(np.percentile(samples, 95) * 1000),
+        'p99_ms': float(np.percentile(samples, 99) * 1000),
+    }
+
+
+def load_frames(clip_paths, count, width, height, seed):
+    """
+    Load frames from video clips, or generate deterministic synthetic frames.
+    Synthetic frames contain no faces or hands, so they measure the
+    detector-miss path; pass real clips for representative numbers.
+
+    Returns:
+        list: BGR frames held in memory so disk decoding is not measured
+    """
+    frames = []
+    for path in clip_paths:
+        cap = cv2.VideoCapture(path)
+        while len(frames) < count:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(cv2.flip(frame, 1))  # Match CameraManager's mirror effect
+        cap.release()
+    if clip_paths and not frames:
+        raise SystemExit(f"Could not read any frames from {clip_paths}")
+    if not frames:
+        rng = np.random.default_rng(seed)
+        frames = [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(min(count, 16))]
+    return frames
+
+
+def make_landmark_fixtures(count, seed):
+    """
+    Generate synthetic normalized landmarks: one face and five finger tips per fixture,
+    with finger tips scattered around the face so every classification branch is hit.
+
+    Returns:
+        list: (finger_tips_normalized, (mouth_top, mouth_bottom, hair_top, hair_bottom)) tuples
+    """
+    rng = np.random.default_rng(seed)
+    fixtures = []
+    for _ in range(count):
+        center_x, mouth_y = rng.uniform(0.35, 0.65), rng.uniform(0.5, 0.7)
+        face_height = rng.uniform(0.2, 0.35)
+        mouth_top = (center_x, mouth_y - 0.01)
+        mouth_bottom = (center_x, mouth_y + 0.01)
+        hair_top = (center_x, mouth_y - face_height)
+        hair_bottom = (center_x, mouth_y - face_height * 0.6)
+        anchor = mouth_top if rng.random() < 0.5 else hair_top
+        tips = [tuple(np.clip(np.array(anchor) + rng.normal(0, 0.08, 2), 0, 1)) for _ in range(5)]
+        fixtures.append((tips, (mouth_top, mouth_bottom, hair_top, hair_bottom)))
+    return fixtures
+
+
+def bench_pipeline(frames, iterations, warmup, sensitivity, inference_interval=1):
+    from detection import DetectionManager
+    detection_manager = DetectionManager(draw_landmarks=True, inference_interval=inference_interval)
+    try:
+        for i in range(warmup):
+            detection_manager.process_frame(frames[i % len(frames)].copy(), sensitivity)
+        samples = []
+        for i in range(iterations):
+            frame = frames[i % len(frames)].copy()
+            start = time.perf_counter()
+            detection_manager.process_frame(frame, sensitivity)
+            samples.append(time.perf_counter() - start)
+    finally:
+        detection_manager.cleanup()
+    return summarize(samples)
+
+
+def bench_geometry(fixtures, iterations, width, height, sensitivity):
+    samples = []
+    for i in range(iterations):
+        tips, anchors = fixtures[i % len(fixtures)]
+        start = time.perf_counter()
+        mouth_point, hair_point = face_targets(*anchors, width, height)
+        finger_tips = [(int(x * width), int(y * height)) for x, y in tips]
+        classify_proximity(finger_tips, mouth_point, hair_point, sensitivity)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def bench_encode(frames, iterations, warmup, quality):
+    def encode(frame):
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        cv2.imencode('.jpg', rgb, [cv2.IMWRITE_JPEG_QUALITY, quality])
+
+    for i in range(warmup):
+        encode(frames[i % len(frames)])
+    samples = []
+    for i in range(iterations):
+        frame = frames[i % len(frames)]
+        start = time.perf_counter()
+        encode(frame)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def bench_anchors(frames):
+    """
+    Compare each face anchor provider against FaceMesh on the same frames.
+    Errors are the pixel distances between the mouth and hair targets a provider
+    yields and those derived from FaceMesh, on frames where both found a face.
+
+    Returns:
+        dict: One summary per provider, keyed 'anchors_<provider>'
+    """
+    from face_anchors import FACE_ANCHOR_PROVIDERS, create_face_anchor_provider
+
+    rgb_frames = [cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) for frame in frames]
+    height, width = rgb_frames[0].shape[:2]
+    reference_provider = create_face_anchor_provider('face_mesh')
+    try:
+        reference = [reference_provider.locate(frame) for frame in rgb_frames]
+    finally:
+        reference_provider.close()
+
+    results = {}
+    for name in FACE_ANCHOR_PROVIDERS:
+        provider = create_face_anchor_provider(name)
+        samples, mouth_errors, hair_errors, found = [], [], [], 0
+        try:
+            for frame, expected in zip(rgb_frames, reference):
+                start = time.perf_counter()
+                anchors = provider.locate(frame)
+                samples.append(time.perf_counter() - start)
+                if anchors is None:
+                    continue
+                found += 1
+                if expected is None:
+                    continue
+                mouth, hair = face_targets(*anchors, width, height)
+                expected_mouth, expected_hair = face_targets(*expected, width, height)
+                mouth_errors.append(np.hypot(mouth[0] - expected_mouth[0], mouth[1] - expected_mouth[1]))
+                hair_errors.append(np.hypot(hair[0] - expected_hair[0], hair[1] - expected_hair[1]))
+        finally:
+            provider.close()
+        summary = summarize(samples)
+        summary['detection_rate'] = found / len(rgb_frames)
+        for key, errors in (('mouth', mouth_errors), ('hair', hair_errors)):
+            summary[f'{key}_error_px_mean'] = float(np.mean(errors)) if errors else None
+            summary[f'{key}_error_px_p95'] = float(np.percentile(errors, 95)) if errors else None
+        results[f'anchors_{name}'] = summary
+    return results
+
+
+def meta_mismatches(results, baseline):
+    """
+    Find run-defining meta fields that differ from the baseline.
+
+    Returns:
+        list: Human-readable descriptions of every mismatch
+    """
+    mismatches = []
+    for key in RUN_DEFINING_META:
+        current, previous = results['meta'].get(key), baseline.get('meta', {}).get(key)
+        if current != previous:
+            mismatches.append(f"{key}: baseline {previous!r}, current {current!r}")
+    return mismatches
+
+
+def compare(results, baseline, max_regression):
+    """
+    Compare results against a baseline run.
+
+    Args:
+        results: Current results dict
+        baseline: Baseline results dict loaded from JSON
+        max_regression: Allowed relative slowdown (0.15 = 15%)
+
+    Returns:
+        list: Human-readable descriptions of every regression found
+    """
+    regressions = []
+    for suite, current in results['suites'].items():
+        previous = baseline.get('suites', {}).get(suite)
+        if not previous:
+            continue
+        for key in ('p50_ms', 'p95_ms'):
+            if previous[key] > 0 and current[key] > previous[key] * (1 + max_regression):
+                regressions.append(f"{suite}.{key}: {previous[key]:.3f} -> {current[key]:.3f}")
+        if previous['throughput_per_s'] > 0 and \
+                current['throughput_per_s'] < previous['throughput_per_s'] / (1 + max_regression):
+            regressions.append(f"{suite}.throughput_per_s: {previous['throughput_per_s']:.1f} -> "
+                               f"{current['throughput_per_s']:.1f}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the HabitAware detection pipeline")
+    parser.add_argument('--suite', action='append', choices=SUITES,
+                        help="Suite to run (repeatable, default: all)")
+    parser.add_argument('--clip', action='append', default=[], help="Video clip to use as input (repeatable)")
+    parser.add_argument('--frames', type=int, default=200, help="Timed iterations per suite")
+    parser.add_argument('--warmup', type=int, default=10, help="Untimed warmup iterations")
+    parser.add_argument('--width', type=int, default=1280, help="Synthetic frame width")
+    parser.add_argument('--height', type=int, default=720, help="Synthetic frame height")
+    parser.add_argument('--sensitivity', type=int, default=50, help="Detection sensitivity in pixels")
+    parser.add_argument('--inference-interval', type=int, default=1,
+                        help="Run full inference every N frames in the pipeline suite (optical flow in between)")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for synthetic inputs")
+    parser.add_argument('--output', help="Write results to this JSON file")
+    parser.add_argument('--baseline', help="Compare against a previous results JSON file")
+    parser.add_argument('--max-regression', type=float, default=0.15,
+                        help="Fail if latency grows (or throughput drops) by more than this fraction")
+    parser.add_argument('--allow-meta-mismatch', action='store_true',
+                        help="Only warn when the baseline was run with different settings")
+    args = parser.parse_args(argv)
+
+    suites = args.suite or SUITES
+    cv2.setNumThreads(1)  # Keep runs comparable across machines with different core counts
+
+    results = {
+        'meta': {
+            'timestamp': time.time(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'opencv': cv2.__version__,
+            'clips': args.clip,
+            'frames': args.frames,
+            'seed': args.seed,
+            'inference_interval': args.inference_interval,
+            'width': args.width,
+            'height': args.height,
+            'sensitivity': args.sensitivity,
+        },
+        'suites': {},
+    }
+
+    frames = None
+    if 'pipeline' in suites or 'encode' in suites or 'anchors' in suites:
+        frames = load_frames(args.clip, args.frames, args.width, args.height, args.seed)
+    if 'pipeline' in suites:
+        results['suites']['pipeline'] = bench_pipeline(
+            frames, args.frames, args.warmup, args.sensitivity, args.inference_interval)
+    if 'geometry' in suites:
+        fixtures = make_landmark_fixtures(1000, args.seed)
+        results['suites']['geometry'] = bench_geometry(
+            fixtures, args.frames * 50, args.width, args.height, args.sensitivity)
+    if 'encode' in suites:
+        results['suites']['encode'] = bench_encode(frames, args.frames, args.warmup, quality=75)
+    if 'anchors' in suites:
+        if args.clip:
+            results['suites'].update(bench_anchors(frames))
+        elif args.suite:
+            print("anchors suite skipped: it needs --clip recordings with a face in view")
+
+    for suite, summary in results['suites'].items():
+        line = (f"{suite:24s} {summary['throughput_per_s']:10.1f}/s  p50 {summary['p50_ms']:8.3f}ms  "
+                f"p95 {summary['p95_ms']:8.3f}ms  p99 {summary['p99_ms']:8.3f}ms")
+        if 'detection_rate' in summary:
+            line += f"  found {summary['detection_rate']:.0%}"
+            if summary['mouth_error_px_mean'] is not None:
+                line += (f"  mouth err {summary['mouth_error_px_mean']:.1f}px (p95 {summary['mouth_error_px_p95']:.1f})"
+                         f"  hair err {summary['hair_error_px_mean']:.1f}px (p95 {summary['hair_error_px_p95']:.1f})")
+        print(line)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        mismatches = meta_mismatches(results, baseline)
+        if mismatches:
+            print("Baseline was run with different settings:")
+            for mismatch in mismatches:
+                print(f"  {mismatch}")
+            if not args.allow_meta_mismatch:
+                print("Refusing to compare; pass --allow-meta-mismatch to compare anyway.")
+                return 2
+        regressions = compare(results, baseline, args.max_regression)
+        if regressions:
+            print(f"Regressions beyond {args.max_regression:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
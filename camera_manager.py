@@ -1,4 +1,5 @@
 import cv2
+from metrics import performance_metrics
 
 class CameraManager:
     """
@@ -6,13 +7,17 @@ class CameraManager:
     This class provides a simple interface for working with the webcam and ensures
     proper resource management.
     """
-    def __init__(self):
+    def __init__(self, metrics=None):
         """
         Initialize the camera manager with default values.
         The camera is not started until start_camera() is called.
+
+        Args:
+            metrics: Optional PerformanceMetrics instance (defaults to the shared one)
         """
         self.cap = None  # Will hold the VideoCapture object
         self.camera_active = False  # Tracks if camera is currently active
+        self.metrics = metrics or performance_metrics
 
     def start_camera(self):
         """
@@ -35,6 +40,17 @@ class CameraManager:
             return True
         return False
 
+    def set_frame_rate(self, fps):
+        """
+        Request a new capture frame rate from the camera.
+        Not every camera driver honours this; callers should still pace their reads.
+        
+        Args:
+            fps: Desired frames per second
+        """
+        if self.camera_active and self.cap is not None:
+            self.cap.set(cv2.CAP_PROP_FPS, fps)
+
     def stop_camera(self):
         """
         Stop the camera and release resources if it's active.
@@ -61,9 +77,11 @@ class CameraManager:
         if not self.camera_active or self.cap is None:
             return False, None
 
-        ret, frame = self.cap.read()
+        with self.metrics.stage('capture'):
+            ret, frame = self.cap.read()
         if ret:
-            frame = cv2.flip(frame, 1)  # Flip horizontally for mirror effect
+            with self.metrics.stage('flip'):
+                frame = cv2.flip(frame, 1)  # Flip horizontally for mirror effect
             return True, frame
             
         return False, None
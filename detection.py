@@ -1,6 +1,11 @@
 import cv2
 import mediapipe as mp
 import math
+import time
+from metrics import performance_metrics
+from landmark_tracker import LandmarkFlowTracker
+from face_anchors import create_face_anchor_provider
+from proximity import FINGER_TIP_IDS, face_targets, classify_proximity, min_target_distance
 
 class DetectionManager:
     """
@@ -8,21 +13,72 @@ class DetectionManager:
     This class handles the initialization of MediaPipe models and provides methods
     for processing frames and detecting specific bad habits (hair pulling and nail biting).
     """
-    def __init__(self, draw_landmarks=True):
+    def __init__(self, draw_landmarks=True, metrics=None, hair_extension=1.0, recorder=None,
+                 inference_interval=1, model_complexity=1, refine_landmarks=False,
+                 min_detection_confidence=0.5, min_tracking_confidence=0.5, inference_scale=1.0,
+                 face_provider='face_mesh'):
         """
         Initialize the detection manager with MediaPipe models.
         
         Args:
             draw_landmarks (bool): Whether to draw landmarks and detection zones on the frame.
                                   Useful for debugging or visualization.
+            metrics: Optional PerformanceMetrics instance (defaults to the shared one)
+            hair_extension (float): Height of the hair zone above the forehead, in forehead heights
+            recorder: Optional LandmarkRecorder that receives the landmarks of every frame
+            inference_interval (int): Run the MediaPipe models every N frames and propagate the
+                                      finger tips and face anchors with optical flow in between.
+                                      1 (the default) runs inference on every frame.
+            model_complexity (int): Hands model complexity (0 = lite, 1 = full)
+            refine_landmarks (bool): Whether FaceMesh refines the lip and eye landmarks
+            min_detection_confidence (float): Detection confidence for both models
+            min_tracking_confidence (float): Tracking confidence for both models; lower values
+                                             re-run detection less often
+            inference_scale (float): Scale frames are resized by before inference (1.0 = full size).
+                                     Landmarks are normalized, so coordinates are unaffected.
+            face_provider (str): Model that locates the mouth and forehead anchors: 'face_mesh'
+                                 (full mesh, most precise), 'face_detection' or 'haar_cascade'
+                                 (cheaper, approximate). See face_anchors.py.
         """
         # Initialize MediaPipe models
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(max_num_hands=1)  # Only track one hand
-        self.mp_face_mesh = mp.solutions.face_mesh
-        self.face_mesh = self.mp_face_mesh.FaceMesh(max_num_faces=1)  # Only track one face
+        self.hands = self.mp_hands.Hands(
+            max_num_hands=1,  # Only track one hand
+            model_complexity=model_complexity,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence)
+        self.face_anchors = create_face_anchor_provider(
+            face_provider,
+            refine_landmarks=refine_landmarks,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence)
+        self.inference_scale = inference_scale
         self.mp_draw = mp.solutions.drawing_utils  # For drawing landmarks
         self.draw_landmarks = draw_landmarks
+        self.metrics = metrics or performance_metrics
+        self.hair_extension = hair_extension
+        self.recorder = recorder
+        self.hand_detected = False  # Whether the last frame contained a hand
+        self.target_distance = float('inf')  # Closest finger-to-target distance in the last frame
+        self.hair_coords = (None, None)  # Hair target of the last frame
+        self.target_point = None  # Target the interacting finger was closest to in the last frame
+        self.tracker = None  # Optical-flow tracker used between inference frames
+        self.hand_count = 0  # Number of tracked points that are finger tips (the rest are face anchors)
+        self.set_inference_interval(inference_interval)
+
+    def set_inference_interval(self, inference_interval):
+        """
+        Change how often full inference runs; optical flow fills the frames in between.
+        
+        Args:
+            inference_interval (int): Run the MediaPipe models every N frames (1 = every frame)
+        """
+        self.inference_interval = inference_interval
+        if inference_interval > 1:
+            self.tracker = self.tracker or LandmarkFlowTracker()
+        else:
+            self.tracker = None
+        self.frames_since_inference = inference_interval  # Forces inference on the next frame
 
     def process_frame(self, frame, sensitivity=100):
         """
@@ -39,100 +95,172 @@ class DetectionManager:
                 - mouth_coords: (x, y) coordinates of the mouth center
                 - behavior: String indicating detected behavior ('hair_pulling', 'nail_biting', or None)
         """
-        # Convert frame to RGB (MediaPipe requires RGB)
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        # Process the frame with both hand and face models
-        hand_results = self.hands.process(frame_rgb)
-        face_results = self.face_mesh.process(frame_rgb)
+        h, w, c = frame.shape
+        drawn_hands = []  # MediaPipe hand landmarks to draw, only set on inference frames
+
+        # Between inference frames, propagate the tracked points with optical flow
+        tracked = None
+        new_hand = None  # (frame_rgb, hand_points, hand_landmarks) of a hand that just appeared
+        if self.tracker is not None:
+            between_inferences = self.frames_since_inference < self.inference_interval
+            if between_inferences and self.hand_count == 0:
+                # No hand to track: run only the hands model so an entering hand is picked up
+                # on the next frame, while the face anchors keep following optical flow
+                frame_rgb = self._inference_rgb(frame)
+                hand_points, hand_landmarks = self._detect_hands(frame_rgb)
+                if hand_points:
+                    new_hand = (frame_rgb, hand_points, hand_landmarks)
+            with self.metrics.stage('flow'):
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                if between_inferences and new_hand is None:
+                    tracked = self.tracker.track(gray)
+
+        if tracked is not None:
+            self.frames_since_inference += 1
+            hand_points, face_anchors = self._unpack_tracked(tracked, w, h)
+        else:
+            if new_hand is not None:
+                frame_rgb, hand_points, drawn_hands = new_hand  # Only the face is still missing
+                face_anchors = self._locate_face(frame_rgb)
+            else:
+                hand_points, face_anchors, drawn_hands = self._run_inference(frame)
+            if self.tracker is not None:
+                self.frames_since_inference = 1
+                self.hand_count = len(hand_points)
+                self.tracker.reset(gray, [(x * w, y * h) for x, y in hand_points + (face_anchors or [])])
 
         # Initialize coordinates and behavior
         hand_x, hand_y = None, None
         mouth_x, mouth_y = None, None
-        face_zones = {'top': None, 'bottom': None}
+        hair_x, hair_y = None, None
+        target_point = None
         behavior = None
-        finger_tips = []
+        self.target_distance = float('inf')
 
-        # Process hand landmarks
-        if hand_results.multi_hand_landmarks:
-            for hand_landmarks in hand_results.multi_hand_landmarks:
-                # Draw landmarks if enabled
-                if self.draw_landmarks:
-                    self.mp_draw.draw_landmarks(frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
-                
-                # Get all finger tips coordinates
-                h, w, c = frame.shape
-                
-                # Thumb (4), Index finger (8), middle finger (12), ring finger (16), pinky (20)
-                finger_landmarks = [4, 8, 12, 16, 20]
-                for landmark_id in finger_landmarks:
-                    finger_tip = hand_landmarks.landmark[landmark_id]
-                    finger_tips.append((int(finger_tip.x * w), int(finger_tip.y * h)))
-                
-                # Store all finger tips for later use
-                if finger_tips:
-                    hand_x, hand_y = finger_tips[0]  # Default to first finger if no face detected
+        with self.metrics.stage('proximity'):
+            # Get all finger tips coordinates
+            finger_tips = [(int(x * w), int(y * h)) for x, y in hand_points]
+            if finger_tips:
+                hand_x, hand_y = finger_tips[0]  # Default to first finger if no face detected
 
-        # Process face landmarks
-        if face_results.multi_face_landmarks:
-            for face_landmarks in face_results.multi_face_landmarks:
-                h, w, c = frame.shape
-                
-                # Get mouth landmarks (13 and 14 are top and bottom of mouth)
-                mouth_top = face_landmarks.landmark[13]
-                mouth_bottom = face_landmarks.landmark[14]
-                
-                # Get hair landmarks (10 is top of forehead, 151 is eyebrow level)
-                hair_top = face_landmarks.landmark[10]
-                hair_bottom = face_landmarks.landmark[151]
-                
-                # Calculate mouth center
-                mouth_x = int((mouth_top.x + mouth_bottom.x) / 2 * w)
-                mouth_y = int((mouth_top.y + mouth_bottom.y) / 2 * h)
-                
-                # Calculate hair center (extend above head)
-                hair_height = hair_bottom.y - hair_top.y
-                hair_x = int(hair_top.x * w)
-                hair_y = int((hair_top.y - hair_height) * h)  # Extend above head by one head height
-                
-                # Draw centers if enabled
-                if self.draw_landmarks:
-                    cv2.circle(frame, (mouth_x, mouth_y), 5, (255, 0, 255), -1)  # Pink for mouth
-                    cv2.circle(frame, (hair_x, hair_y), 5, (0, 255, 0), -1)  # Green for hair
+            if face_anchors is not None:
+                # Mouth (top/bottom) and hair (forehead top/eyebrow level) landmarks
+                (mouth_x, mouth_y), (hair_x, hair_y) = face_targets(*face_anchors, w, h, self.hair_extension)
                 
                 # If we have finger tips, find the closest finger to either point
                 if finger_tips:
-                    min_distance = float('inf')
-                    closest_finger = None
-                    target_point = None
-                    behavior = None
-                    
-                    for finger_x, finger_y in finger_tips:
-                        # Calculate distances to both points
-                        mouth_distance = math.hypot(mouth_x - finger_x, mouth_y - finger_y)
-                        hair_distance = math.hypot(hair_x - finger_x, hair_y - finger_y)
-                        
-                        # Find which point is closer and within sensitivity
-                        if mouth_distance < hair_distance and mouth_distance < sensitivity:
-                            min_distance = mouth_distance
-                            closest_finger = (finger_x, finger_y)
-                            target_point = (mouth_x, mouth_y)
-                            behavior = 'nail_biting'
-                        elif hair_distance < mouth_distance and hair_distance < sensitivity:
-                            min_distance = hair_distance
-                            closest_finger = (finger_x, finger_y)
-                            target_point = (hair_x, hair_y)
-                            behavior = 'hair_pulling'
+                    closest_finger, target_point, behavior = classify_proximity(
+                        finger_tips, (mouth_x, mouth_y), (hair_x, hair_y), sensitivity)
+                    self.target_distance = min_target_distance(
+                        finger_tips, (mouth_x, mouth_y), (hair_x, hair_y))
                     
                     if closest_finger:
                         hand_x, hand_y = closest_finger
-                        # Draw line to show the interaction
-                        if self.draw_landmarks:
-                            color = (0, 255, 0) if behavior == 'hair_pulling' else (0, 0, 255)
-                            cv2.line(frame, (hand_x, hand_y), target_point, color, 2)
+
+        self.hand_detected = bool(finger_tips)
+        self.hair_coords = (hair_x, hair_y)
+        self.target_point = target_point
+
+        if self.recorder is not None:
+            with self.metrics.stage('record'):
+                self.recorder.record(time.time(), w, h, hand_points[:5] or None, face_anchors)
+
+        # Draw landmarks, face targets and the interaction line if enabled
+        if self.draw_landmarks:
+            with self.metrics.stage('overlay'):
+                for hand_landmarks in drawn_hands:
+                    self.mp_draw.draw_landmarks(frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
+                if tracked is not None:
+                    for finger_tip in finger_tips:
+                        cv2.circle(frame, finger_tip, 4, (255, 255, 0), -1)  # Cyan for propagated tips
+                self.draw_targets(frame, (hand_x, hand_y), (mouth_x, mouth_y), (hair_x, hair_y),
+                                  target_point, behavior)
 
         return frame, (hand_x, hand_y), (mouth_x, mouth_y), behavior
 
+    @staticmethod
+    def draw_targets(frame, hand_coords, mouth_coords, hair_coords, target_point, behavior):
+        """
+        Draw the mouth and hair targets and the interaction line on a frame.
+        
+        Args:
+            frame: The frame to draw on
+            hand_coords: (x, y) coordinates of the closest finger to face
+            mouth_coords: (x, y) coordinates of the mouth center
+            hair_coords: (x, y) coordinates of the hair target
+            target_point: The target the interacting finger is near, or None
+            behavior: The detected behavior, or None
+        """
+        if mouth_coords[0] is not None:
+            cv2.circle(frame, mouth_coords, 5, (255, 0, 255), -1)  # Pink for mouth
+            cv2.circle(frame, hair_coords, 5, (0, 255, 0), -1)  # Green for hair
+        if target_point is not None:
+            color = (0, 255, 0) if behavior == 'hair_pulling' else (0, 0, 255)
+            cv2.line(frame, hand_coords, target_point, color, 2)
+
+    def _run_inference(self, frame):
+        """
+        Run the MediaPipe hand and face models on a frame.
+        
+        Args:
+            frame: The input BGR frame
+            
+        Returns:
+            tuple: (hand_points, face_anchors, hand_landmarks)
+                - hand_points: Normalized (x, y) finger tips of every detected hand
+                - face_anchors: Normalized mouth top, mouth bottom, forehead top and
+                                eyebrow level points, or None if no face was found
+                - hand_landmarks: The raw MediaPipe hand landmarks, for drawing
+        """
+        # Process the frame with both hand and face models
+        frame_rgb = self._inference_rgb(frame)
+        hand_points, hand_landmarks = self._detect_hands(frame_rgb)
+        face_anchors = self._locate_face(frame_rgb)
+        return hand_points, face_anchors, hand_landmarks
+
+    def _inference_rgb(self, frame):
+        """
+        Convert a BGR frame to the (optionally downscaled) RGB image the models run on.
+        """
+        # Convert frame to RGB (MediaPipe requires RGB)
+        with self.metrics.stage('color_convert'):
+            if self.inference_scale != 1.0:  # Downscale before inference to save model time
+                frame = cv2.resize(frame, None, fx=self.inference_scale, fy=self.inference_scale,
+                                   interpolation=cv2.INTER_AREA)
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    def _detect_hands(self, frame_rgb):
+        """
+        Run the hands model.
+
+        Returns:
+            tuple: (hand_points, hand_landmarks), as in _run_inference
+        """
+        with self.metrics.stage('hands'):
+            hand_results = self.hands.process(frame_rgb)
+        hand_landmarks = hand_results.multi_hand_landmarks or []
+        hand_points = [self._landmark_point(landmarks, i) for landmarks in hand_landmarks for i in FINGER_TIP_IDS]
+        return hand_points, hand_landmarks
+
+    def _locate_face(self, frame_rgb):
+        """
+        Run the face anchor provider.
+
+        Returns:
+            list: Normalized face anchors, or None if no face was found
+        """
+        with self.metrics.stage(self.face_anchors.name):
+            return self.face_anchors.locate(frame_rgb)
+
+    def _unpack_tracked(self, tracked, width, height):
+        """
+        Split optical-flow tracked pixel points back into normalized finger tips and face anchors.
+        """
+        points = [(x / width, y / height) for x, y in tracked]
+        hand_points = points[:self.hand_count]
+        face_anchors = points[self.hand_count:] or None
+        return hand_points, face_anchors
+
     def get_finger_tips(self, hand_landmarks, frame_shape):
         """
         Get coordinates of all finger tips from hand landmarks.
@@ -146,13 +274,18 @@ class DetectionManager:
         """
         h, w, c = frame_shape
         finger_tips = []
-        # Thumb (4), Index finger (8), middle finger (12), ring finger (16), pinky (20)
-        finger_landmarks = [4, 8, 12, 16, 20]
-        for landmark_id in finger_landmarks:
+        for landmark_id in FINGER_TIP_IDS:
             finger_tip = hand_landmarks.landmark[landmark_id]
             finger_tips.append((int(finger_tip.x * w), int(finger_tip.y * h)))
         return finger_tips
 
+    def _landmark_point(self, landmarks, landmark_id):
+        """
+        Return the normalized (x, y) of a single MediaPipe landmark.
+        """
+        landmark = landmarks.landmark[landmark_id]
+        return landmark.x, landmark.y
+
     def calculate_distance(self, hand_coords, target_coords):
         """
         Calculate the Euclidean distance between hand and target coordinates.
@@ -174,4 +307,6 @@ class DetectionManager:
         Should be called when the application is closing.
         """
         self.hands.close()
-        self.face_mesh.close()
\ No newline at end of file
+        self.face_anchors.close()
+        if self.recorder is not None:
+            self.recorder.close()
\ No newline at end of file
@@ -0,0 +1,344 @@
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from detection import DetectionManager
+from landmark_recording import LandmarkRecorder
+from metrics import PerformanceMetrics, performance_metrics
+
+
+class SharedFrameRing:
+    """
+    Fixed set of frame-sized slots in shared memory. The camera process writes
+    a frame into a free slot and only the slot index is sent to the worker,
+    which reads the pixels in place, so frames are never pickled or copied
+    through a pipe.
+    """
+    def __init__(self, shape, slots=3, name=None):
+        """
+        Create or attach to a ring.
+
+        Args:
+            shape: Frame shape (height, width, channels); frames are uint8
+            slots (int): Number of frames that can be in flight at once
+            name: Name of an existing ring to attach to, or None to create one
+        """
+        self.shape = tuple(shape)
+        self.slots = slots
+        frame_bytes = int(np.prod(self.shape))
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=frame_bytes * slots)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=self.shm.buf)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, slot, frame):
+        """
+        Copy a frame into a slot.
+        """
+        self.frames[slot][...] = frame
+
+    def read(self, slot):
+        """
+        Returns:
+            np.ndarray: A view of the frame in the slot (no copy)
+        """
+        return self.frames[slot]
+
+    def close(self):
+        """
+        Detach from the ring; the creating side also frees the shared memory.
+        """
+        del self.frames
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class _FrameStageTimings(PerformanceMetrics):
+    """
+    Metrics sink for the worker's DetectionManager. Stage durations are kept
+    per frame instead of in histograms, so they can be sent back with the
+    frame's result and recorded in the supervisor's metrics.
+    """
+    def __init__(self):
+        super().__init__()
+        self.timings = []
+
+    def record(self, name, seconds):
+        if self.enabled:
+            self.timings.append((name, seconds))
+
+    def take(self):
+        """
+        Returns:
+            list: (stage, seconds) pairs recorded since the last call
+        """
+        timings, self.timings = self.timings, []
+        return timings
+
+
+def _worker_main(ring_name, shape, slots, requests, results, options, recording_path):
+    """
+    Entry point of the detection worker process.
+    Receives ('frame', seq, slot, sensitivity) or ('config', settings) messages
+    and replies with one compact result tuple per frame, ending with the frame's
+    stage timings when metrics are enabled.
+    """
+    ring = SharedFrameRing(shape, slots, name=ring_name)
+    recorder = LandmarkRecorder(recording_path) if recording_path else None
+    stage_timings = _FrameStageTimings()
+    detection_manager = DetectionManager(draw_landmarks=False, metrics=stage_timings, recorder=recorder, **options)
+    try:
+        while True:
+            message = requests.recv()
+            if message is None:
+                break
+            if message[0] == 'config':
+                settings = message[1]
+                if 'inference_interval' in settings:
+                    detection_manager.set_inference_interval(settings['inference_interval'])
+                if 'metrics_enabled' in settings:
+                    stage_timings.set_enabled(settings['metrics_enabled'])
+                continue
+            _, seq, slot, sensitivity = message
+            _, hand_coords, mouth_coords, behavior = detection_manager.process_frame(ring.read(slot), sensitivity)
+            results.send((seq, slot, hand_coords, mouth_coords, detection_manager.hair_coords,
+                          detection_manager.target_point, behavior, detection_manager.hand_detected,
+                          detection_manager.target_distance, stage_timings.take()))
+    except (EOFError, KeyboardInterrupt):
+        pass  # Supervisor went away
+    finally:
+        detection_manager.cleanup()
+        ring.close()
+
+
+class DetectionWorker:
+    """
+    Runs DetectionManager in a child process behind the same process_frame
+    interface. Frames go through a SharedFrameRing and results come back over
+    a pipe, so inference runs on another core without sharing the GIL with the
+    Streamlit script thread, and a crash in the models only kills the worker,
+    which is restarted automatically with an exponential backoff. A worker that
+    keeps crashing before producing a result exhausts the restart budget and
+    process_frame raises RuntimeError with its exit code.
+
+    process_frame does not wait for the frame it was given: it returns the most
+    recent result available (usually from the previous frame) drawn onto the
+    current frame, keeping capture and UI updates running at full speed.
+
+    The supervisor's metrics enabled flag is forwarded to the worker, and the
+    worker's stage timings (color conversion, models, flow, proximity, recording)
+    come back with each result and are recorded in the supervisor's metrics.
+    """
+    def __init__(self, slots=3, result_timeout=1.0, draw_landmarks=True, recording_path=None,
+                 max_restarts=5, restart_backoff=0.5, **detection_options):
+        """
+        Initialize the supervisor. The worker process starts with the first frame.
+
+        Args:
+            slots (int): Frames that may be in flight; extra frames are dropped
+            result_timeout (float): Seconds to wait for the first result after each start
+            draw_landmarks (bool): Whether to draw detection targets on returned frames
+            recording_path: Optional landmark recording file written by the worker;
+                            every later start writes its own numbered file next to it
+            max_restarts (int): Consecutive crashes (without a result in between) tolerated
+            restart_backoff (float): Seconds before the first restart, doubled after each crash
+            **detection_options: Passed to the worker's DetectionManager
+                                 (inference_interval, hair_extension, model_complexity, ...)
+        """
+        self.slots = slots
+        self.result_timeout = result_timeout
+        self.draw_landmarks = draw_landmarks
+        self.options = dict(detection_options)
+        self.options.setdefault('inference_interval', 1)
+        self.recording_path = recording_path
+        self.max_restarts = max_restarts
+        self.restart_backoff = restart_backoff
+        self.context = multiprocessing.get_context('spawn')  # Never fork a process holding MediaPipe or Streamlit state
+        self.metrics = performance_metrics
+        self.ring = None
+        self.process = None
+        self.requests = None
+        self.results = None
+        self.free_slots = []
+        self.seq = 0
+        self.starts = 0  # Number of worker processes launched (numbers the recording files)
+        self.restarts = 0  # Number of times the worker had to be restarted after a crash
+        self.failures = 0  # Crashes since the last result was received
+        self.last_exitcode = None  # Exit code of the last worker that died
+        self.restart_at = 0  # Earliest time the next restart may happen
+        self.awaiting_first_result = False
+        self.worker_metrics_enabled = None  # Metrics flag last sent to the worker
+        self.last_result = None
+        self.hand_detected = False
+        self.target_distance = float('inf')
+        self.hair_coords = (None, None)
+        self.target_point = None
+
+    def _start(self, shape):
+        """
+        Create the frame ring for the given frame shape (if needed) and launch the worker.
+        """
+        if self.ring is None or self.ring.shape != tuple(shape):
+            self._stop_process()
+            if self.ring is not None:
+                self.ring.close()
+            self.ring = SharedFrameRing(shape, self.slots)
+            self._clear_result()  # Coordinates from the old frame size no longer apply
+        requests_reader, self.requests = self.context.Pipe(duplex=False)
+        self.results, results_writer = self.context.Pipe(duplex=False)
+        recording_path = self.recording_path
+        if recording_path and self.starts:
+            # Every later worker writes a new file so the earlier frames are kept
+            root, ext = os.path.splitext(recording_path)
+            recording_path = f"{root}_{self.starts}{ext}"
+        self.starts += 1
+        self.process = self.context.Process(
+            target=_worker_main,
+            args=(self.ring.name, self.ring.shape, self.slots, requests_reader, results_writer, self.options,
+                  recording_path),
+            daemon=True,
+        )
+        self.process.start()
+        requests_reader.close()
+        results_writer.close()
+        self.free_slots = list(range(self.slots))
+        self.awaiting_first_result = True
+        self.worker_metrics_enabled = None  # A new worker starts with metrics disabled
+
+    def _clear_result(self):
+        self.last_result = None
+        self.hand_detected = False
+        self.target_distance = float('inf')
+        self.hair_coords = (None, None)
+        self.target_point = None
+
+    def _stop_process(self):
+        if self.process is None:
+            return
+        if self.process.is_alive():
+            try:
+                self.requests.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(timeout=2)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
+        self.requests.close()
+        self.results.close()
+        self.process = None
+
+    def ensure_alive(self, shape):
+        """
+        Start the worker, or restart it if it died or the frame size changed.
+        After a crash the restart waits out the backoff delay, so the worker may
+        not be running when this returns.
+
+        Returns:
+            bool: True if the worker had to be (re)started
+
+        Raises:
+            RuntimeError: If the worker crashed more than max_restarts times in a row
+        """
+        if self.process is not None and self.process.is_alive() and self.ring.shape == tuple(shape):
+            return False
+        if self.process is not None and not self.process.is_alive():
+            self.last_exitcode = self.process.exitcode
+            self.failures += 1
+            self._stop_process()
+            self._clear_result()  # Don't keep drawing the dead worker's last targets
+            if self.failures > self.max_restarts:
+                raise RuntimeError(f"Detection worker exited with code {self.last_exitcode}; "
+                                   f"gave up after {self.max_restarts} restarts")
+            self.restarts += 1
+            self.restart_at = time.time() + self.restart_backoff * 2 ** (self.failures - 1)
+        if self.process is None and time.time() < self.restart_at:
+            return False  # Backing off after a crash
+        self._start(shape)
+        return True
+
+    def set_inference_interval(self, inference_interval):
+        """
+        Forward a new inference interval to the worker.
+        """
+        self.options['inference_interval'] = inference_interval
+        if self.process is not None and self.process.is_alive():
+            self.requests.send(('config', {'inference_interval': inference_interval}))
+
+    def _send(self, message):
+        try:
+            self.requests.send(message)
+        except (BrokenPipeError, OSError):
+            pass  # Worker died; ensure_alive handles it on the next frame
+
+    def _collect(self, timeout=0):
+        """
+        Read every result the worker has produced so far and free their slots.
+        """
+        while self.results.poll(timeout):
+            try:
+                result = self.results.recv()
+            except EOFError:
+                break  # Worker died; ensure_alive restarts it on the next frame
+            self.free_slots.append(result[1])
+            for name, seconds in result[-1]:
+                self.metrics.record(name, seconds)
+            self.last_result = result
+            self.failures = 0
+            timeout = 0
+
+    def process_frame(self, frame, sensitivity=100):
+        """
+        Submit a frame to the worker and return the latest detection result.
+
+        Args:
+            frame: The input frame from the camera
+            sensitivity: The distance threshold for detecting behaviors (in pixels)
+
+        Returns:
+            tuple: (processed_frame, hand_coords, mouth_coords, behavior), as DetectionManager.process_frame
+        """
+        self.ensure_alive(frame.shape)
+
+        if self.process is not None:
+            with self.metrics.stage('worker_submit'):
+                self._collect()
+                if self.worker_metrics_enabled != self.metrics.enabled:
+                    self.worker_metrics_enabled = self.metrics.enabled
+                    self._send(('config', {'metrics_enabled': self.metrics.enabled}))
+                if self.free_slots:
+                    slot = self.free_slots.pop()
+                    self.ring.write(slot, frame)
+                    self.seq += 1
+                    self._send(('frame', self.seq, slot, sensitivity))
+                if self.awaiting_first_result:
+                    # Wait once per start for the model to load; a crash ends the wait early
+                    self.awaiting_first_result = False
+                    self._collect(self.result_timeout)
+
+        if self.last_result is None:
+            return frame, (None, None), (None, None), None
+
+        (_, _, hand_coords, mouth_coords, self.hair_coords, self.target_point, behavior,
+         self.hand_detected, self.target_distance, _) = self.last_result
+        if self.draw_landmarks:
+            with self.metrics.stage('overlay'):
+                DetectionManager.draw_targets(frame, hand_coords, mouth_coords, self.hair_coords,
+                                              self.target_point, behavior)
+        return frame, hand_coords, mouth_coords, behavior
+
+    def cleanup(self):
+        """
+        Stop the worker process and free the shared memory.
+        """
+        self._stop_process()
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
@@ -0,0 +1,173 @@
+import os
+
+import cv2
+import mediapipe as mp
+
+from proximity import MOUTH_LANDMARK_IDS, HAIR_LANDMARK_IDS
+
+
+class FaceMeshAnchors:
+    """
+    Face anchors from the full 468-point MediaPipe FaceMesh.
+    This is the reference provider: landmarks 13/14 (mouth) and 10/151 (forehead)
+    are read directly from the mesh.
+    """
+    name = 'face_mesh'
+
+    def __init__(self, refine_landmarks=False, min_detection_confidence=0.5, min_tracking_confidence=0.5):
+        """
+        Initialize the FaceMesh model.
+
+        Args:
+            refine_landmarks (bool): Whether FaceMesh refines the lip and eye landmarks
+            min_detection_confidence (float): Face detection confidence
+            min_tracking_confidence (float): Landmark tracking confidence
+        """
+        self.face_mesh = mp.solutions.face_mesh.FaceMesh(
+            max_num_faces=1,  # Only track one face
+            refine_landmarks=refine_landmarks,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence)
+
+    def locate(self, frame_rgb):
+        """
+        Find the face anchors in a frame.
+
+        Args:
+            frame_rgb: RGB frame
+
+        Returns:
+            list: Normalized (x, y) of mouth top, mouth bottom, forehead top and
+                  eyebrow level, or None if no face was found
+        """
+        results = self.face_mesh.process(frame_rgb)
+        face_anchors = None
+        for face_landmarks in results.multi_face_landmarks or []:
+            face_anchors = [(face_landmarks.landmark[i].x, face_landmarks.landmark[i].y)
+                            for i in MOUTH_LANDMARK_IDS + HAIR_LANDMARK_IDS]
+        return face_anchors
+
+    def close(self):
+        self.face_mesh.close()
+
+
+class FaceDetectionAnchors:
+    """
+    Face anchors from the MediaPipe face detector's six keypoints.
+    The mouth comes straight from the mouth keypoint; the forehead landmarks are
+    placed along the eye-to-mouth axis, so the estimate follows head tilt.
+    """
+    name = 'face_detection'
+
+    # Forehead positions as multiples of the eye-to-mouth vector, measured upwards from the eyes
+    FOREHEAD_TOP = 1.3  # Landmark 10
+    EYEBROW_LEVEL = 0.65  # Landmark 151
+
+    def __init__(self, model_selection=0, min_detection_confidence=0.5, **_):
+        """
+        Initialize the face detector.
+
+        Args:
+            model_selection (int): 0 for faces within ~2 m of the camera, 1 for up to ~5 m
+            min_detection_confidence (float): Face detection confidence
+        """
+        self.face_detection = mp.solutions.face_detection.FaceDetection(
+            model_selection=model_selection,
+            min_detection_confidence=min_detection_confidence)
+
+    def locate(self, frame_rgb):
+        """
+        Find the face anchors in a frame (see FaceMeshAnchors.locate).
+        """
+        results = self.face_detection.process(frame_rgb)
+        if not results.detections:
+            return None
+        # Keypoints: right eye, left eye, nose tip, mouth center, right ear, left ear
+        keypoints = results.detections[0].location_data.relative_keypoints
+        eye_x = (keypoints[0].x + keypoints[1].x) / 2
+        eye_y = (keypoints[0].y + keypoints[1].y) / 2
+        mouth = (keypoints[3].x, keypoints[3].y)
+        down_x, down_y = mouth[0] - eye_x, mouth[1] - eye_y
+        forehead_top = (eye_x - self.FOREHEAD_TOP * down_x, eye_y - self.FOREHEAD_TOP * down_y)
+        eyebrow_level = (eye_x - self.EYEBROW_LEVEL * down_x, eye_y - self.EYEBROW_LEVEL * down_y)
+        return [mouth, mouth, forehead_top, eyebrow_level]
+
+    def close(self):
+        self.face_detection.close()
+
+
+class HaarCascadeAnchors:
+    """
+    Face anchors from the bundled OpenCV Haar cascade plus a fixed geometric
+    face model: anchors sit at set fractions of the detected face box. Cheapest
+    option, but it does not follow head tilt and the box jitters between frames.
+    """
+    name = 'haar_cascade'
+
+    # Anchor heights as fractions of the face box, from its top edge
+    MOUTH = 0.78
+    FOREHEAD_TOP = -0.05  # Landmark 10 sits slightly above the box
+    EYEBROW_LEVEL = 0.12  # Landmark 151
+
+    def __init__(self, cascade_path=None, detect_scale=0.5, scale_factor=1.1, min_neighbors=5, **_):
+        """
+        Load the cascade.
+
+        Args:
+            cascade_path: Cascade XML (defaults to the one bundled with the app)
+            detect_scale (float): Frames are downscaled by this factor before detection
+            scale_factor (float): Cascade image pyramid step
+            min_neighbors (int): Neighbouring detections required to keep a face
+        """
+        cascade_path = cascade_path or os.path.join(os.path.dirname(__file__), "haarcascade_frontalface_default.xml")
+        self.cascade = cv2.CascadeClassifier(cascade_path)
+        if self.cascade.empty():
+            raise ValueError(f"Could not load Haar cascade from {cascade_path}")
+        self.detect_scale = detect_scale
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+
+    def locate(self, frame_rgb):
+        """
+        Find the face anchors in a frame (see FaceMeshAnchors.locate).
+        """
+        gray = cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2GRAY)
+        if self.detect_scale != 1.0:
+            gray = cv2.resize(gray, None, fx=self.detect_scale, fy=self.detect_scale, interpolation=cv2.INTER_AREA)
+        height, width = gray.shape
+        faces = self.cascade.detectMultiScale(gray, scaleFactor=self.scale_factor, minNeighbors=self.min_neighbors,
+                                              minSize=(width // 10, width // 10))
+        if len(faces) == 0:
+            return None
+        x, y, w, h = max(faces, key=lambda face: face[2] * face[3])  # Largest face
+        center_x = (x + w / 2) / width
+        mouth = (center_x, (y + self.MOUTH * h) / height)
+        forehead_top = (center_x, (y + self.FOREHEAD_TOP * h) / height)
+        eyebrow_level = (center_x, (y + self.EYEBROW_LEVEL * h) / height)
+        return [mouth, mouth, forehead_top, eyebrow_level]
+
+    def close(self):
+        pass
+
+
+FACE_ANCHOR_PROVIDERS = {
+    FaceMeshAnchors.name: FaceMeshAnchors,
+    FaceDetectionAnchors.name: FaceDetectionAnchors,
+    HaarCascadeAnchors.name: HaarCascadeAnchors,
+}
+
+
+def create_face_anchor_provider(name, **options):
+    """
+    Create a face anchor provider by name.
+
+    Args:
+        name: One of FACE_ANCHOR_PROVIDERS ('face_mesh', 'face_detection', 'haar_cascade')
+        **options: Provider options; options a provider does not use are ignored
+
+    Returns:
+        A provider with locate(frame_rgb) and close() methods
+    """
+    if name not in FACE_ANCHOR_PROVIDERS:
+        raise ValueError(f"Unknown face anchor provider '{name}', choose from {sorted(FACE_ANCHOR_PROVIDERS)}")
+    return FACE_ANCHOR_PROVIDERS[name](**options)
@@ -0,0 +1,117 @@
+import time
+
+
+class AdaptiveFrameScheduler:
+    """
+    Chooses the capture and inference rate from what the detector last saw.
+    With no hand in view the pipeline idles at a low rate, a visible hand away
+    from the face runs at a medium rate, and a finger tip approaching the mouth
+    or hair target ramps up to the full rate. Ramping up is immediate; ramping
+    down only happens after lower tiers have been observed for a while, and
+    the approach/release distances form a hysteresis band so the rate does not
+    flap when a hand hovers at the boundary.
+    """
+    IDLE = 'idle'
+    WATCH = 'watch'
+    ACTIVE = 'active'
+    TIERS = (IDLE, WATCH, ACTIVE)
+
+    def __init__(self, idle_fps=5, watch_fps=15, active_fps=30, approach_distance=200,
+                 release_distance=260, ramp_down_after=1.0, idle_after=3.0):
+        """
+        Initialize the scheduler in the active tier.
+
+        Args:
+            idle_fps: Frame rate when no hand is detected
+            watch_fps: Frame rate when a hand is visible but far from the face
+            active_fps: Full frame rate used when a finger approaches a target
+            approach_distance: Finger-to-target distance (pixels) that switches to the active tier
+            release_distance: Distance (pixels) a finger must move beyond to leave the active tier
+            ramp_down_after: Seconds the watch tier must be observed before dropping to it
+            idle_after: Seconds without a hand before dropping to the idle tier
+        """
+        self.fps = {self.IDLE: idle_fps, self.WATCH: watch_fps, self.ACTIVE: active_fps}
+        self.approach_distance = approach_distance
+        self.release_distance = release_distance
+        self.ramp_down_delay = {self.IDLE: idle_after, self.WATCH: ramp_down_after}
+        self.tier = self.ACTIVE
+        self.pending_tier = None  # Highest lower tier seen since the ramp-down window opened
+        self.pending_since = 0  # When the current tier was first not needed
+        self.tier_time = {tier: 0.0 for tier in self.TIERS}
+        self.tier_started = time.time()
+        self.next_frame_time = 0
+
+    def observe(self, hand_detected, target_distance):
+        """
+        Update the tier from the latest detection results.
+
+        Args:
+            hand_detected (bool): Whether any hand was detected in the frame
+            target_distance (float): Closest finger-to-target distance in pixels,
+                                     or infinity if it could not be measured
+
+        Returns:
+            str: The current tier after the update
+        """
+        now = time.time()
+        if not hand_detected:
+            candidate = self.IDLE
+        elif target_distance < self.approach_distance:
+            candidate = self.ACTIVE
+        elif self.tier == self.ACTIVE and target_distance <= self.release_distance:
+            candidate = self.ACTIVE  # Inside the hysteresis band, keep the full rate
+        else:
+            candidate = self.WATCH
+
+        if self.TIERS.index(candidate) >= self.TIERS.index(self.tier):
+            # Ramp up (or stay) immediately
+            self.pending_tier = None
+            if candidate != self.tier:
+                self._switch(candidate, now)
+        elif self.pending_tier is None:
+            self.pending_tier = candidate
+            self.pending_since = now
+        else:
+            # Lower tiers may alternate (a hand flickering in and out of view), so the
+            # window keeps running and drops to the highest tier seen in it
+            if self.TIERS.index(candidate) > self.TIERS.index(self.pending_tier):
+                self.pending_tier = candidate
+            if now - self.pending_since >= self.ramp_down_delay[self.pending_tier]:
+                tier = self.pending_tier
+                self.pending_tier = None
+                self._switch(tier, now)
+        return self.tier
+
+    def _switch(self, tier, now):
+        self.tier_time[self.tier] += now - self.tier_started
+        self.tier = tier
+        self.tier_started = now
+        self.next_frame_time = now  # Apply the new rate from the next frame
+
+    def current_fps(self):
+        """
+        Returns:
+            float: Frame rate of the current tier
+        """
+        return self.fps[self.tier]
+
+    def wait(self):
+        """
+        Sleep until the next frame is due at the current tier's rate.
+        """
+        now = time.time()
+        if self.next_frame_time > now:
+            time.sleep(self.next_frame_time - now)
+            now = self.next_frame_time
+        self.next_frame_time = now + 1.0 / self.current_fps()
+
+    def tier_durations(self):
+        """
+        Report the time spent in each tier, including the current one.
+
+        Returns:
+            dict: Tier name -> seconds
+        """
+        durations = dict(self.tier_time)
+        durations[self.tier] += time.time() - self.tier_started
+        return durations
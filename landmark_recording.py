@@ -0,0 +1,274 @@
+"""
+Landmark recording and vectorized replay for tuning detection thresholds.
+
+A recording stores, per frame, the normalized finger tip landmarks (4, 8, 12, 16, 20)
+and the four face landmarks the detector uses (13, 14, 10, 151) as fixed-size float32
+records behind a small header, so a file can be memory-mapped directly with numpy.
+Missing hands or faces are stored as NaN.
+
+Usage:
+    python landmark_recording.py session.habl --labels episodes.csv \\
+        --sensitivity 30:80:5 --hair-extension 0.5,1.0,1.5
+"""
+import argparse
+import csv
+import os
+import struct
+import sys
+
+import numpy as np
+
+MAGIC = b'HALM'
+VERSION = 1
+HEADER = struct.Struct('<4sHHH6x')  # magic, version, width, height, padding to 16 bytes
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('hand', '<f4', (5, 2)),  # Finger tips, normalized (x, y)
+    ('face', '<f4', (4, 2)),  # Mouth top, mouth bottom, forehead top, eyebrow level
+])
+
+BEHAVIOR_CODES = {None: 0, 'nail_biting': 1, 'hair_pulling': 2}
+BEHAVIOR_NAMES = {code: name for name, code in BEHAVIOR_CODES.items()}
+
+
+class LandmarkRecorder:
+    """
+    Appends per-frame landmarks to a binary recording file.
+    Records are buffered and written in blocks to keep the per-frame cost low.
+    """
+    def __init__(self, path, flush_every=300):
+        """
+        Initialize the recorder. The file header is written on the first record,
+        once the frame size is known.
+
+        Args:
+            path: Output file path
+            flush_every (int): Number of frames buffered before writing to disk
+        """
+        self.path = path
+        self.flush_every = flush_every
+        self.file = None
+        self.buffer = np.zeros(flush_every, dtype=RECORD_DTYPE)
+        self.buffered = 0
+        self.frames_written = 0
+
+    def record(self, timestamp, width, height, finger_tips=None, face_anchors=None):
+        """
+        Record one frame.
+
+        Args:
+            timestamp: Frame time in seconds
+            width, height: Frame size in pixels
+            finger_tips: List of five normalized (x, y) finger tips, or None if no hand
+            face_anchors: List of four normalized (x, y) face landmarks, or None if no face
+        """
+        if self.file is None:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            self.file = open(self.path, 'wb')
+            self.file.write(HEADER.pack(MAGIC, VERSION, width, height))
+
+        entry = self.buffer[self.buffered]
+        entry['timestamp'] = timestamp
+        entry['hand'] = finger_tips if finger_tips is not None else np.nan
+        entry['face'] = face_anchors if face_anchors is not None else np.nan
+        self.buffered += 1
+        if self.buffered == self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """
+        Write buffered records to disk.
+        """
+        if self.file is not None and self.buffered:
+            self.buffer[:self.buffered].tofile(self.file)
+            self.file.flush()
+            self.frames_written += self.buffered
+            self.buffered = 0
+
+    def close(self):
+        """
+        Flush remaining records and close the file.
+        """
+        self.flush()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def load_recording(path):
+    """
+    Memory-map a recording.
+
+    Args:
+        path: Recording file path
+
+    Returns:
+        tuple: (width, height, records) where records is a read-only structured memmap
+    """
+    with open(path, 'rb') as f:
+        magic, version, width, height = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} landmark recording")
+    count = (os.path.getsize(path) - HEADER.size) // RECORD_DTYPE.itemsize
+    records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER.size, shape=(count,))
+    return width, height, records
+
+
+def replay_sweep(records, width, height, sensitivities, hair_extensions=(1.0,), chunk_size=65536):
+    """
+    Re-run the behavior classification for a grid of sensitivities and hair zone
+    definitions, vectorized over fixed-size chunks of frames so memory use does not
+    grow with the length of the recording. Mirrors proximity.face_targets and
+    proximity.classify_proximity, including their integer pixel rounding.
+
+    Args:
+        records: Structured landmark records (see RECORD_DTYPE)
+        width, height: Frame size the recording was made at
+        sensitivities: Sequence of distance thresholds in pixels
+        hair_extensions: Sequence of hair zone heights (forehead heights above the forehead)
+        chunk_size: Frames classified per vectorized pass
+
+    Returns:
+        np.ndarray: Behavior codes of shape (len(hair_extensions), len(sensitivities), frames)
+    """
+    sensitivities = np.asarray(sensitivities, dtype=np.float64)
+    hair_extensions = np.asarray(hair_extensions, dtype=np.float64)
+    threshold = sensitivities[None, :, None, None]
+    behaviors = np.zeros((len(hair_extensions), len(sensitivities), len(records)), dtype=np.int8)
+
+    for start in range(0, len(records), chunk_size):
+        chunk = records[start:start + chunk_size]
+        hand = chunk['hand'].astype(np.float64)
+        face = chunk['face'].astype(np.float64)
+
+        # Finger tips in pixels: (frames, 5)
+        finger_x = np.trunc(hand[:, :, 0] * width)
+        finger_y = np.trunc(hand[:, :, 1] * height)
+
+        # Mouth target: (frames,)
+        mouth_x = np.trunc((face[:, 0, 0] + face[:, 1, 0]) / 2 * width)
+        mouth_y = np.trunc((face[:, 0, 1] + face[:, 1, 1]) / 2 * height)
+
+        # Hair target per zone definition: (zones, frames)
+        hair_height = face[:, 3, 1] - face[:, 2, 1]
+        hair_x = np.trunc(face[:, 2, 0] * width)
+        hair_y = np.trunc((face[None, :, 2, 1] - hair_extensions[:, None] * hair_height[None, :]) * height)
+
+        # Distances: mouth (frames, 5), hair (zones, frames, 5)
+        mouth_distance = np.hypot(mouth_x[:, None] - finger_x, mouth_y[:, None] - finger_y)
+        hair_distance = np.hypot(hair_x[None, :, None] - finger_x[None], hair_y[:, :, None] - finger_y[None])
+
+        # Against sensitivities: (zones, sensitivities, frames, 5); NaNs compare False
+        nail = (mouth_distance < hair_distance)[:, None] & (mouth_distance[None, None] < threshold)
+        hair = (hair_distance < mouth_distance)[:, None] & (hair_distance[:, None] < threshold)
+        codes = nail.astype(np.int8)
+        codes *= BEHAVIOR_CODES['nail_biting']
+        codes[hair] = BEHAVIOR_CODES['hair_pulling']  # Never overlaps nail: both use strict comparisons
+
+        # The last qualifying finger wins, as in classify_proximity
+        last = codes.shape[-1] - 1 - np.argmax(codes[..., ::-1] > 0, axis=-1)
+        behaviors[..., start:start + len(chunk)] = np.take_along_axis(codes, last[..., None], axis=-1)[..., 0]
+    return behaviors
+
+
+def load_episodes(path):
+    """
+    Load labelled episodes from a CSV file with 'start', 'end' and 'behavior' columns.
+    Times use the same clock as the recording timestamps.
+
+    Returns:
+        list: (start, end, behavior) tuples
+    """
+    with open(path, newline='') as f:
+        return [(float(row['start']), float(row['end']), row['behavior']) for row in csv.DictReader(f)]
+
+
+def episode_labels(timestamps, episodes):
+    """
+    Convert labelled episodes into per-frame behavior codes.
+
+    Args:
+        timestamps: Frame timestamps
+        episodes: (start, end, behavior) tuples
+
+    Returns:
+        np.ndarray: Behavior code per frame (0 where no episode covers the frame)
+    """
+    timestamps = np.asarray(timestamps)
+    labels = np.zeros(timestamps.shape, dtype=np.int8)
+    for start, end, behavior in episodes:
+        labels[(timestamps >= start) & (timestamps <= end)] = BEHAVIOR_CODES[behavior]
+    return labels
+
+
+def score_sweep(behaviors, labels):
+    """
+    Score a sweep against per-frame labels.
+
+    Args:
+        behaviors: Output of replay_sweep, shape (zones, sensitivities, frames)
+        labels: Per-frame behavior codes
+
+    Returns:
+        dict: 'precision', 'recall' and 'f1' arrays of shape (zones, sensitivities)
+    """
+    labels = np.asarray(labels)[None, None, :]
+    true_positive = ((behaviors == labels) & (labels > 0)).sum(axis=-1)
+    predicted = (behaviors > 0).sum(axis=-1)
+    actual = (labels > 0).sum()
+    precision = np.divide(true_positive, predicted, out=np.zeros(true_positive.shape), where=predicted > 0)
+    recall = true_positive / actual if actual else np.zeros(true_positive.shape)
+    total = precision + recall
+    f1 = np.divide(2 * precision * recall, total, out=np.zeros(total.shape), where=total > 0)
+    return {'precision': precision, 'recall': recall, 'f1': f1}
+
+
+def _parse_range(value):
+    """
+    Parse 'start:stop:step' (inclusive) or a comma-separated list into floats.
+    """
+    if ':' in value:
+        start, stop, step = (float(part) for part in value.split(':'))
+        return np.arange(start, stop + step / 2, step)
+    return np.array([float(part) for part in value.split(',')])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep detection thresholds over a landmark recording")
+    parser.add_argument('recording', help="Landmark recording file")
+    parser.add_argument('--labels', help="CSV of labelled episodes (start,end,behavior)")
+    parser.add_argument('--sensitivity', default='30:80:5', help="start:stop:step or comma list, in pixels")
+    parser.add_argument('--hair-extension', default='1.0', help="start:stop:step or comma list")
+    args = parser.parse_args(argv)
+
+    width, height, records = load_recording(args.recording)
+    sensitivities = _parse_range(args.sensitivity)
+    hair_extensions = _parse_range(args.hair_extension)
+    behaviors = replay_sweep(records, width, height, sensitivities, hair_extensions)
+    print(f"{len(records)} frames at {width}x{height}, "
+          f"{len(hair_extensions)}x{len(sensitivities)} configurations")
+
+    scores = score_sweep(behaviors, episode_labels(records['timestamp'], load_episodes(args.labels))) \
+        if args.labels else None
+    print("hair_ext  sensitivity  nail_frames  hair_frames" + ("  precision  recall     f1" if scores else ""))
+    for z, extension in enumerate(hair_extensions):
+        for s, sensitivity in enumerate(sensitivities):
+            row = behaviors[z, s]
+            line = (f"{extension:8.2f}  {sensitivity:11.1f}  {np.count_nonzero(row == 1):11d}  "
+                    f"{np.count_nonzero(row == 2):11d}")
+            if scores:
+                line += (f"  {scores['precision'][z, s]:9.3f}  {scores['recall'][z, s]:6.3f}  "
+                         f"{scores['f1'][z, s]:5.3f}")
+            print(line)
+
+    if scores:
+        z, s = np.unravel_index(np.argmax(scores['f1']), scores['f1'].shape)
+        print(f"Best F1 {scores['f1'][z, s]:.3f} at sensitivity {sensitivities[s]:g}, "
+              f"hair extension {hair_extensions[z]:g}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+import cv2
+import numpy as np
+
+
+class LandmarkFlowTracker:
+    """
+    Propagates a small set of points (finger tips and face anchors) between
+    frames with sparse pyramidal Lucas-Kanade optical flow. Tracking reports
+    failure when too few points survive a forward-backward consistency check
+    or when the points move too far between frames, so the caller can fall
+    back to running full inference early.
+    """
+    def __init__(self, max_motion=40.0, max_fb_error=2.0, min_tracked_ratio=0.8, win_size=21, max_level=3):
+        """
+        Initialize the tracker.
+
+        Args:
+            max_motion: Median per-frame displacement (pixels) treated as a motion spike
+            max_fb_error: Forward-backward error (pixels) above which a point is considered lost
+            min_tracked_ratio: Fraction of points that must track reliably
+            win_size: Lucas-Kanade search window size in pixels
+            max_level: Number of pyramid levels
+        """
+        self.max_motion = max_motion
+        self.max_fb_error = max_fb_error
+        self.min_tracked_ratio = min_tracked_ratio
+        self.lk_params = dict(
+            winSize=(win_size, win_size),
+            maxLevel=max_level,
+            criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03),
+        )
+        self.prev_gray = None
+        self.points = None
+        self.last_confidence = 0.0  # Fraction of points tracked in the last call
+        self.last_motion = 0.0  # Median displacement in the last call
+
+    def reset(self, gray, points):
+        """
+        Start tracking from freshly inferred points.
+
+        Args:
+            gray: Grayscale frame the points belong to
+            points: List of (x, y) pixel coordinates
+        """
+        self.prev_gray = gray
+        self.points = np.float32(points).reshape(-1, 1, 2)
+
+    def track(self, gray):
+        """
+        Propagate the points into a new frame.
+
+        Args:
+            gray: The new grayscale frame
+
+        Returns:
+            list: (x, y) pixel coordinates in the same order as given to reset(),
+                  or None if tracking is unreliable and inference should run
+        """
+        if self.prev_gray is None or self.prev_gray.shape != gray.shape:
+            return None
+        if len(self.points) == 0:
+            # Nothing was detected; keep reporting nothing until the next inference
+            self.prev_gray = gray
+            return []
+
+        next_points, status, _ = cv2.calcOpticalFlowPyrLK(self.prev_gray, gray, self.points, None, **self.lk_params)
+        back_points, back_status, _ = cv2.calcOpticalFlowPyrLK(gray, self.prev_gray, next_points, None, **self.lk_params)
+
+        fb_error = np.linalg.norm((back_points - self.points).reshape(-1, 2), axis=1)
+        good = (status.ravel() == 1) & (back_status.ravel() == 1) & (fb_error < self.max_fb_error)
+        self.last_confidence = float(good.mean())
+        if self.last_confidence < self.min_tracked_ratio:
+            return None
+
+        displacement = (next_points - self.points).reshape(-1, 2)
+        self.last_motion = float(np.median(np.linalg.norm(displacement[good], axis=1)))
+        if self.last_motion > self.max_motion:
+            return None
+
+        # Move points that were lost with the median motion of the reliable ones
+        next_points[~good] = self.points[~good] + np.median(displacement[good], axis=0)
+
+        self.prev_gray = gray
+        self.points = next_points
+        return [(float(x), float(y)) for x, y in next_points.reshape(-1, 2)]
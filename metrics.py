@@ -0,0 +1,273 @@
+import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+
+
+class LatencyHistogram:
+    """
+    Fixed-memory latency histogram with logarithmically spaced buckets.
+    Samples are never stored individually, so memory use stays constant no matter
+    how long the application runs. Percentiles are estimated from bucket bounds.
+    """
+    def __init__(self, min_seconds=1e-5, max_seconds=10.0, growth=1.15):
+        """
+        Initialize an empty histogram.
+
+        Args:
+            min_seconds: Upper bound of the first bucket
+            max_seconds: Largest latency tracked before the overflow bucket
+            growth: Ratio between consecutive bucket bounds (accuracy vs. memory)
+        """
+        bucket_count = int(math.ceil(math.log(max_seconds / min_seconds, growth))) + 1
+        self.bounds = [min_seconds * growth ** i for i in range(bucket_count)]
+        self.counts = [0] * (bucket_count + 1)  # Last bucket catches overflow
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        """
+        Add a single latency sample.
+
+        Args:
+            seconds: Measured duration in seconds
+        """
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        """
+        Estimate a percentile from the bucket counts.
+
+        Args:
+            q: Percentile in the range 0-100
+
+        Returns:
+            float: Upper bound of the bucket holding the percentile, in seconds
+        """
+        if self.count == 0:
+            return 0.0
+        rank = max(1, int(math.ceil(q / 100.0 * self.count)))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                if index < len(self.bounds):
+                    return min(self.bounds[index], self.max)
+                return self.max
+        return self.max
+
+    def mean(self):
+        """
+        Returns:
+            float: Mean latency in seconds, or 0 when no samples were recorded
+        """
+        return self.total / self.count if self.count else 0.0
+
+    def reset(self):
+        """
+        Clear all recorded samples while keeping the bucket layout.
+        """
+        self.counts = [0] * len(self.counts)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class _NullStage:
+    """
+    Shared no-op context manager returned when metrics are disabled.
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class PerformanceMetrics:
+    """
+    Collects per-stage latencies for the capture and detection pipeline.
+    When disabled, stage() returns a shared no-op context manager so the
+    instrumentation left in the hot path costs a single attribute check.
+    """
+    def __init__(self, enabled=False, fps_window=120):
+        """
+        Initialize the metrics registry.
+
+        Args:
+            enabled (bool): Whether timings should be recorded
+            fps_window (int): Number of recent frame timestamps used to compute fps
+        """
+        self.enabled = enabled
+        self.histograms = {}  # Stage name -> LatencyHistogram
+        self.frame_times = deque(maxlen=fps_window)
+        self.lock = threading.Lock()  # Stages may be recorded from helper threads
+
+    def set_enabled(self, enabled):
+        """
+        Turn recording on or off. Samples recorded so far are kept.
+
+        Args:
+            enabled (bool): Whether timings should be recorded
+        """
+        self.enabled = enabled
+
+    def stage(self, name):
+        """
+        Time a block of code under the given stage name.
+
+        Usage:
+            with metrics.stage('hands'):
+                results = hands.process(frame)
+
+        Args:
+            name: Stage name (e.g. 'capture', 'face_mesh', 'ui_push')
+
+        Returns:
+            A context manager that records the elapsed time on exit
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        """
+        Record an already measured duration for a stage.
+
+        Args:
+            name: Stage name
+            seconds: Duration in seconds
+        """
+        if not self.enabled:
+            return
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def mark_frame(self):
+        """
+        Mark the completion of one frame; used to compute the frame rate.
+        """
+        if self.enabled:
+            self.frame_times.append(time.perf_counter())
+
+    def fps(self):
+        """
+        Returns:
+            float: Frame rate over the recent window, or 0 if not enough frames
+        """
+        if len(self.frame_times) < 2:
+            return 0.0
+        elapsed = self.frame_times[-1] - self.frame_times[0]
+        return (len(self.frame_times) - 1) / elapsed if elapsed > 0 else 0.0
+
+    def reset(self):
+        """
+        Drop all recorded samples.
+        """
+        with self.lock:
+            self.histograms = {}
+            self.frame_times.clear()
+
+    def snapshot(self):
+        """
+        Summarize all stages.
+
+        Returns:
+            dict: {'fps': float, 'stages': {name: {'count', 'mean_ms', 'p50_ms',
+                  'p95_ms', 'p99_ms', 'max_ms'}}}
+        """
+        with self.lock:
+            stages = {}
+            for name, histogram in sorted(self.histograms.items()):
+                stages[name] = {
+                    'count': histogram.count,
+                    'mean_ms': histogram.mean() * 1000,
+                    'p50_ms': histogram.percentile(50) * 1000,
+                    'p95_ms': histogram.percentile(95) * 1000,
+                    'p99_ms': histogram.percentile(99) * 1000,
+                    'max_ms': histogram.max * 1000,
+                }
+        return {'fps': self.fps(), 'stages': stages}
+
+    def to_json(self, indent=2):
+        """
+        Returns:
+            str: The current snapshot serialized as JSON
+        """
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self, prefix='habitaware'):
+        """
+        Render the current metrics in the Prometheus text exposition format.
+
+        Args:
+            prefix: Metric name prefix
+
+        Returns:
+            str: Prometheus text format with one summary per stage and an fps gauge
+        """
+        lines = [
+            f"# HELP {prefix}_stage_latency_seconds Per-stage pipeline latency.",
+            f"# TYPE {prefix}_stage_latency_seconds summary",
+        ]
+        with self.lock:
+            for name, histogram in sorted(self.histograms.items()):
+                for quantile in (0.5, 0.95, 0.99):
+                    value = histogram.percentile(quantile * 100)
+                    lines.append(f'{prefix}_stage_latency_seconds{{stage="{name}",quantile="{quantile}"}} {value:.6f}')
+                lines.append(f'{prefix}_stage_latency_seconds_sum{{stage="{name}"}} {histogram.total:.6f}')
+                lines.append(f'{prefix}_stage_latency_seconds_count{{stage="{name}"}} {histogram.count}')
+        lines.append(f"# HELP {prefix}_fps Frames processed per second.")
+        lines.append(f"# TYPE {prefix}_fps gauge")
+        lines.append(f"{prefix}_fps {self.fps():.3f}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, directory):
+        """
+        Write the current snapshot as JSON and Prometheus text files.
+        Each file is replaced atomically, so a scraper never reads a partial file.
+
+        Args:
+            directory: Output directory (created if missing)
+
+        Returns:
+            tuple: (json_path, prometheus_path)
+        """
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        paths = []
+        for file_name, content in (("habitaware_metrics.json", self.to_json()),
+                                   ("habitaware_metrics.prom", self.to_prometheus())):
+            path = os.path.join(directory, file_name)
+            with open(path + ".tmp", 'w') as f:
+                f.write(content)
+            os.replace(path + ".tmp", path)
+            paths.append(path)
+        return tuple(paths)
+
+
+# Shared instance used by the camera, detection and UI components
+performance_metrics = PerformanceMetrics()
@@ -0,0 +1,92 @@
+import math
+
+# Thumb (4), Index finger (8), middle finger (12), ring finger (16), pinky (20)
+FINGER_TIP_IDS = [4, 8, 12, 16, 20]
+# 13 and 14 are top and bottom of mouth
+MOUTH_LANDMARK_IDS = (13, 14)
+# 10 is top of forehead, 151 is eyebrow level
+HAIR_LANDMARK_IDS = (10, 151)
+
+
+def face_targets(mouth_top, mouth_bottom, hair_top, hair_bottom, width, height, hair_extension=1.0):
+    """
+    Compute the mouth and hair target points from normalized face landmarks.
+
+    Args:
+        mouth_top, mouth_bottom: Normalized (x, y) of the top and bottom of the mouth
+        hair_top, hair_bottom: Normalized (x, y) of the top of the forehead and eyebrow level
+        width, height: Frame size in pixels
+        hair_extension: How many forehead heights above the forehead the hair target sits
+
+    Returns:
+        tuple: ((mouth_x, mouth_y), (hair_x, hair_y)) in pixels
+    """
+    # Calculate mouth center
+    mouth_x = int((mouth_top[0] + mouth_bottom[0]) / 2 * width)
+    mouth_y = int((mouth_top[1] + mouth_bottom[1]) / 2 * height)
+
+    # Calculate hair center (extend above head)
+    hair_height = hair_bottom[1] - hair_top[1]
+    hair_x = int(hair_top[0] * width)
+    hair_y = int((hair_top[1] - hair_extension * hair_height) * height)
+    return (mouth_x, mouth_y), (hair_x, hair_y)
+
+
+def min_target_distance(finger_tips, mouth_point, hair_point):
+    """
+    Distance from the closest finger tip to either the mouth or hair target.
+
+    Args:
+        finger_tips: List of (x, y) finger tip coordinates in pixels
+        mouth_point: (x, y) mouth target in pixels
+        hair_point: (x, y) hair target in pixels
+
+    Returns:
+        float: The smallest distance in pixels, or infinity if there are no finger tips
+    """
+    distance = float('inf')
+    for finger_x, finger_y in finger_tips:
+        distance = min(distance,
+                       math.hypot(mouth_point[0] - finger_x, mouth_point[1] - finger_y),
+                       math.hypot(hair_point[0] - finger_x, hair_point[1] - finger_y))
+    return distance
+
+
+def classify_proximity(finger_tips, mouth_point, hair_point, sensitivity):
+    """
+    Find the finger tip interacting with the mouth or hair target.
+    Each finger is assigned to whichever target is closer; if that distance is
+    within the sensitivity, the finger counts as an interaction. When several
+    fingers qualify, the last one in finger_tips wins.
+
+    Args:
+        finger_tips: List of (x, y) finger tip coordinates in pixels
+        mouth_point: (x, y) mouth target in pixels
+        hair_point: (x, y) hair target in pixels
+        sensitivity: The distance threshold for detecting behaviors (in pixels)
+
+    Returns:
+        tuple: (closest_finger, target_point, behavior), all None when no finger qualifies
+    """
+    closest_finger = None
+    target_point = None
+    behavior = None
+    mouth_x, mouth_y = mouth_point
+    hair_x, hair_y = hair_point
+
+    for finger_x, finger_y in finger_tips:
+        # Calculate distances to both points
+        mouth_distance = math.hypot(mouth_x - finger_x, mouth_y - finger_y)
+        hair_distance = math.hypot(hair_x - finger_x, hair_y - finger_y)
+
+        # Find which point is closer and within sensitivity
+        if mouth_distance < hair_distance and mouth_distance < sensitivity:
+            closest_finger = (finger_x, finger_y)
+            target_point = mouth_point
+            behavior = 'nail_biting'
+        elif hair_distance < mouth_distance and hair_distance < sensitivity:
+            closest_finger = (finger_x, finger_y)
+            target_point = hair_point
+            behavior = 'hair_pulling'
+
+    return closest_finger, target_point, behavior
@@ -2,6 +2,7 @@ import streamlit as st
 import cv2
 import time  
 from StressPopup import StressPopup
+from metrics import performance_metrics
 
 class UI:
     """
@@ -18,6 +19,11 @@ class UI:
         self.frame_placeholder = None  # Will hold the frame display area
         self.stats_placeholder = None  # Will hold the statistics display area 
         self.stress_popup = StressPopup() 
+        self.metrics = performance_metrics
+        self.metrics_placeholder = None  # Will hold the performance metrics panel
+        self.metrics_refresh_interval = 1.0  # Seconds between metrics panel refreshes
+        self.last_metrics_refresh = 0
+        self.metrics_export_dir = "metrics"  # Snapshot files refreshed with the panel
 
     def setup_page(self):
         """
@@ -72,8 +78,55 @@ class UI:
             frame: The frame to display
         """
         if self.frame_placeholder:
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)  # Convert to RGB for display
-            self.frame_placeholder.image(frame, channels='RGB')
+            with self.metrics.stage('ui_color_convert'):
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)  # Convert to RGB for display
+            with self.metrics.stage('ui_push'):
+                self.frame_placeholder.image(frame, channels='RGB')
+
+    def create_metrics_panel(self):
+        """
+        Create the optional performance metrics panel in the sidebar.
+        Enabling the panel turns on latency recording; when it is off the
+        instrumentation in the pipeline is a no-op. The snapshot is exported to
+        files on every panel refresh rather than through download buttons, since
+        a button click reruns the script and stops the camera.
+        
+        Returns:
+            bool: Whether performance metrics are enabled
+        """
+        with st.sidebar:
+            enabled = st.checkbox("Show Performance Metrics", value=False)
+            self.metrics.set_enabled(enabled)
+            if enabled:
+                st.subheader("Performance")
+                self.metrics_placeholder = st.empty()
+                self.render_metrics()
+                st.caption(f"Exported to {self.metrics_export_dir}/habitaware_metrics.json and .prom")
+                if st.button("Reset Metrics"):
+                    self.metrics.reset()
+            else:
+                self.metrics_placeholder = None
+            return enabled
+
+    def update_metrics_panel(self):
+        """
+        Refresh the performance metrics panel, at most once per refresh interval
+        so rendering the panel does not itself show up in the frame time.
+        """
+        if self.metrics_placeholder and time.time() - self.last_metrics_refresh >= self.metrics_refresh_interval:
+            self.render_metrics()
+
+    def render_metrics(self):
+        """
+        Render the current per-stage latency percentiles and fps into the panel.
+        """
+        snapshot = self.metrics.snapshot()
+        rows = ["| Stage | p50 ms | p95 ms | p99 ms |", "|---|---|---|---|"]
+        for name, stage in snapshot['stages'].items():
+            rows.append(f"| {name} | {stage['p50_ms']:.1f} | {stage['p95_ms']:.1f} | {stage['p99_ms']:.1f} |")
+        self.metrics_placeholder.markdown(f"**FPS:** {snapshot['fps']:.1f}\n\n" + "\n".join(rows))
+        self.metrics.export(self.metrics_export_dir)
+        self.last_metrics_refresh = time.time()
 
     def format_time(self, seconds):
         """
@@ -93,7 +146,8 @@ class UI:
         else: 
             return f"{seconds//3600}h {(seconds%3600)//60}m"
 
-    def update_stats(self, stress_attempts, sensitivity, stress_duration=0, time_since_last_stress=0):
+    def update_stats(self, stress_attempts, sensitivity, stress_duration=0, time_since_last_stress=0,
+                     frame_rate_tiers=None):
         """
         Update the statistics display with current values.
         
@@ -102,6 +156,7 @@ class UI:
             sensitivity: Current sensitivity setting
             stress_duration: Total duration of stress behaviors
             time_since_last_stress: Time since last stress behavior
+            frame_rate_tiers: Optional dict of seconds spent in each adaptive frame-rate tier
         """
         if self.stats_placeholder:
             # Format last stress time
@@ -115,6 +170,16 @@ class UI:
                 last_stress_str = f"{int(time_since_last_stress)//60}m ago"
             else: 
                 last_stress_str = f"{int(time_since_last_stress//3600)}h ago"
+
+            # Time spent in each adaptive frame-rate tier
+            tiers_html = ""
+            if frame_rate_tiers:
+                tiers_str = " / ".join(f"{tier} {self.format_time(seconds)}" for tier, seconds in frame_rate_tiers.items())
+                tiers_html = f"""
+                        <div style='background-color: black; padding: 1px; border-radius: 2px; box-shadow: 0 1px 2px rgba(0,0,0,0.1);'>
+                            <p style='margin: 0; color: #666; font-size: 12px;'>Frame Rate Tiers</p>
+                            <h2 style='margin: 1px 0; color: #f39c12; font-size: 14px;'>🔋 {tiers_str}</h2>
+                        </div>"""
                 
             self.stats_placeholder.markdown(
                 f"""
@@ -136,7 +201,7 @@ class UI:
                         <div style='background-color: black; padding: 1px; border-radius: 2px; box-shadow: 0 1px 2px rgba(0,0,0,0.1);'>
                             <p style='margin: 0; color: #666; font-size: 12px;'>Last Stressed</p>
                             <h2 style='margin: 1px 0; color: #9b59b6; font-size: 16px;'>🕒 {last_stress_str}</h2>
-                        </div>
+                        </div>{tiers_html}
                     </div>
                 </div>
                 """,